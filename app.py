@@ -8,8 +8,11 @@ import time
 from pathlib import Path
 
 import logging  # added for diagnostics
+import logging.handlers
+import queue
 
-from flask import Flask, jsonify, request, send_from_directory
+import orjson
+from flask import Flask, Response, jsonify, request, send_from_directory
 from flask_cors import CORS
 
 from simulation.engine import SimulationEngine
@@ -21,38 +24,105 @@ CORS(app)
 # ---------------------------------------------------------------------------
 # Basic diagnostic logging
 # ---------------------------------------------------------------------------
-logging.basicConfig(
-    filename="speed_debug.log",
-    level=logging.INFO,
-    format="%(asctime)s %(message)s",
-)
+# Log records are funnelled through a queue to a listener thread, so the
+# simulation loop never blocks on file I/O even when diagnostics are on.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_file_handler = logging.FileHandler("speed_debug.log")
+_file_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _file_handler)
+_log_listener.start()
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+
+# Cached once: the per-iteration loop log is DEBUG-only, so at the default
+# INFO level the hot loop pays a single bool check instead of a format +
+# lock + write per tick.
+_LOG_DEBUG = logger.isEnabledFor(logging.DEBUG)
 
 def _background_loop(engine: SimulationEngine):
     """
     Background simulation thread.
 
     Each loop:
-    • advances the model by the engine’s fixed timestep
-      (`engine.step(engine.timestep)`), **not** by real-time Δt
-    • sleeps for `timestep / speed_factor`, so the real-time pace
-      changes when the UI posts a new speed factor
+    • advances the model by a batch of fixed-timestep sub-steps, **not**
+      by real-time Δt — at high speed factors the whole batch runs in
+      one compiled call so the thread wakes ~once per second instead of
+      speed_factor times per second
+    • waits until an absolute monotonic deadline covering the batch, so
+      pacing doesn't drift from sleep slack
         – speed_factor == 1  → 1 physics step / s   (low CPU)
-        – speed_factor == 10 → 10 steps / s         (faster sim)
+        – speed_factor == 10 → 10 steps / wakeup, once per second
+
+    The wait uses `engine._wake`, so /api/pause and /api/speed can
+    interrupt it immediately instead of waiting out the current sleep.
     """
+    next_deadline = time.perf_counter()
     while engine.running:
-        # Advance physics
-        engine.step(engine.timestep)
-        # Real-time pacing
+        # Advance physics — one batch of sub-steps per wakeup
         sf = max(engine.speed_factor, 0.001)  # avoid division by zero
-        # Diagnostic entry for each loop iteration
-        logging.info("LOOP speed=%.2f dt=%.2f", engine.speed_factor, engine.timestep)
-        time.sleep(engine.timestep / sf)
+        steps = max(1, int(sf))
+        engine.step_n(steps, engine.timestep)
+        # Real-time pacing against an absolute deadline
+        if _LOG_DEBUG:
+            logger.debug("LOOP speed=%.2f dt=%.2f", engine.speed_factor, engine.timestep)
+        next_deadline += steps * engine.timestep / sf
+        delay = next_deadline - time.perf_counter()
+        if delay > 0:
+            engine._wake.wait(delay)
+        else:
+            # Fell behind (slow step or clock stall) — resync instead of
+            # sprinting to catch up on accumulated deadlines.
+            next_deadline = time.perf_counter()
+        engine._wake.clear()
+
+
+def _snapshot_bytes(engine: SimulationEngine) -> bytes:
+    """Return the serialized snapshot, rebuilding the cache if stale.
+
+    The bytes are cached on the engine and invalidated whenever snapshot
+    content changes, so all pollers and streamers between two steps share
+    a single snapshot + serialize.
+    """
+    cached = engine._snapshot_bytes
+    if cached is None:
+        with engine._snapshot_lock:
+            cached = engine._snapshot_bytes
+            if cached is None:
+                cached = orjson.dumps(engine.snapshot())
+                engine._snapshot_bytes = cached
+    return cached
 
 
 @app.route("/api/state")
 def state():
     """Return the current simulation snapshot as JSON."""
-    return jsonify(get_engine().snapshot())
+    return Response(_snapshot_bytes(get_engine()), mimetype="application/json")
+
+
+@app.route("/api/stream")
+def stream():
+    """Push a snapshot as a Server-Sent Event after every state change.
+
+    One event per step() commit replaces timer-driven /api/state polling:
+    each connected client gets the shared cached bytes, and an idle
+    (paused) simulation sends a keep-alive comment instead of data.
+    """
+    engine = get_engine()
+
+    def gen():
+        # Initial snapshot so clients can render before the first step
+        yield b"data: " + _snapshot_bytes(engine) + b"\n\n"
+        while True:
+            with engine._snapshot_cond:
+                notified = engine._snapshot_cond.wait(timeout=15.0)
+            if notified:
+                yield b"data: " + _snapshot_bytes(engine) + b"\n\n"
+            else:
+                yield b": keep-alive\n\n"
+
+    return Response(gen(), mimetype="text/event-stream")
 
 
 @app.route("/api/start", methods=["POST"])
@@ -60,6 +130,7 @@ def start():
     engine = get_engine()
     if not engine.running:
         engine.running = True
+        engine._snapshot_changed()  # "running" is part of the snapshot
         threading.Thread(target=_background_loop, args=(engine,), daemon=True).start()
     return ("", 204)
 
@@ -68,6 +139,8 @@ def start():
 def pause():
     engine = get_engine()
     engine.running = False
+    engine._snapshot_changed()  # "running" is part of the snapshot
+    engine._wake.set()  # wake the loop so it exits immediately
     return ("", 204)
 
 
@@ -97,8 +170,9 @@ def set_speed():
 
     engine = get_engine()
     engine.set_speed(factor)
-    # Diagnostic entry for speed changes
-    logging.info("SET_SPEED %.2f", factor)
+    engine._wake.set()  # re-pace the loop with the new factor right away
+    # Diagnostic entry for speed changes (rare, so logging it is fine)
+    logger.info("SET_SPEED %.2f", factor)
     return ("", 204)
 
 
@@ -115,4 +189,7 @@ def spa(path="index.html"):
 
 
 if __name__ == "__main__":
+    # Local development only; in production run a single gunicorn worker
+    # (the engine lives in process memory) with a thread pool, e.g.
+    #   gunicorn -w 1 -k gthread --threads 8 -b :8080 app:app
     app.run(port=8080, debug=True)
@@ -4,11 +4,11 @@ from __future__ import annotations
 
 from .engine import SimulationEngine
 
-# Singleton instance used by Flask routes
-_engine: SimulationEngine | None = None
+# Singleton instance used by Flask routes. Constructed eagerly at import
+# time (module imports are serialized by the import lock), so get_engine()
+# cannot race under the threaded server and is a single global load with
+# no None-check branch per call.
+_engine = SimulationEngine()
 
 def get_engine() -> SimulationEngine:
-    global _engine
-    if _engine is None:
-        _engine = SimulationEngine()
     return _engine
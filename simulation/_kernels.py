@@ -0,0 +1,177 @@
+"""Numba-compiled numeric kernels for the simulation hot path.
+
+The pure-arithmetic body of ``SimulationEngine.step`` lives here as a
+module-level ``@njit`` function operating on a flat float64 state vector,
+so each step runs as LLVM-compiled machine code instead of paying
+interpreter overhead for every attribute load and float multiply.
+``cache=True`` persists the compiled kernel on disk, so the JIT cost is
+paid once per machine rather than on every process start.
+"""
+from __future__ import annotations
+
+from numba import njit
+
+R_GAS = 8.314  # J/mol·K
+M_CACO3 = 100.09  # kg/kmol
+M_H2SO4 = 98.079  # kg/kmol
+
+# ---------------------------------------------------------------------------
+# State-vector layout
+# ---------------------------------------------------------------------------
+# Four slots per vessel (volume, level, temperature, concentration) in
+# T-01, M-01, R-01 order, followed by the scalar process variables.
+T01_VOL, T01_LEVEL, T01_TEMP, T01_CONC = 0, 1, 2, 3
+M01_VOL, M01_LEVEL, M01_TEMP, M01_CONC = 4, 5, 6, 7
+R01_VOL, R01_LEVEL, R01_TEMP, R01_CONC = 8, 9, 10, 11
+CA_MASS = 12
+PRESSURE = 13  # absolute pressure [bar]
+TIME = 14
+STATE_SIZE = 15
+
+# ---------------------------------------------------------------------------
+# Hoisted step constants — module-level so LLVM constant-folds them into
+# the compiled kernel instead of re-deriving them every call.
+# ---------------------------------------------------------------------------
+_TRANSFER_RATE = 0.5 / 3600.0  # P-01 acid transfer, m3/s
+_WATER_RATE = 4.0 / 3600.0  # V-01 water feed, m3/s
+_P2_RATE = 1.0 / 3600.0  # P-02 transfer to reactor, m3/s
+_INV_M_H2SO4 = 1000.0 / M_H2SO4  # mol/kg, for the acid kmol calc
+
+
+# The explicit signatures force eager compilation when this module is
+# imported (instead of a JIT stall on the first /api/start), and
+# cache=True persists the compiled code to __pycache__ so later runs
+# skip the compile entirely. The call types are fixed, so losing
+# call-site polymorphism costs nothing.
+#
+# NB: no fastmath — the reaction block relies on exact floating-point
+# cancellation (ca_mass reaching 0.0) and fastmath reassociation breaks it.
+@njit("void(f8[:], f8, f8, f8, f8)", cache=True)
+def _step_kernel(state, dt, dv_acid, dv_water, dv_p2):
+    """Advance the simulation state vector by ``dt`` seconds, in place.
+
+    Mirrors the discrete-time model documented in ``engine.py``: acid
+    transfer T-01 → M-01, water dilution, transfer to the reactor,
+    instantaneous CaCO3 + H2SO4 reaction with CO2 pressure build-up and
+    PSV relief above 3 barg.
+
+    ``dv_acid`` / ``dv_water`` / ``dv_p2`` are the rate·dt transfer
+    increments, precomputed once per run by ``SimulationEngine.recompile``
+    since dt is fixed for the life of a run.
+    """
+    state[TIME] += dt
+    m01_vol = state[M01_VOL]
+    r01_vol = state[R01_VOL]
+
+    # Idle fast-path: once M-01 is full (acid transfer and water feed
+    # saturated), P-02 has nowhere to pump, the reaction is exhausted,
+    # and PSV relief would round to a no-op, a step changes nothing but
+    # the clock. This is the long-lived terminal state of a run, so the
+    # batched loop pays ~10 compares per tick instead of the full body.
+    if state[M01_LEVEL] >= m01_vol and (
+        state[CA_MASS] <= 0.0 or state[R01_CONC] <= 0.0
+    ):
+        p_g = max(0.0, state[PRESSURE] - 1.0)
+        psv_idle = (
+            p_g <= 3.0
+            or state[PRESSURE] - (p_g - 3.0) * 0.1 == state[PRESSURE]
+        )
+        p2_idle = (
+            state[R01_LEVEL] >= r01_vol
+            or state[M01_CONC] >= 60.0
+            or state[M01_LEVEL] <= 2.0
+        )
+        arrival_idle = (
+            state[R01_CONC] >= 1e-3
+            or state[M01_CONC] >= 60.0
+            or state[R01_CONC] == state[M01_CONC]
+        )
+        if psv_idle and p2_idle and arrival_idle:
+            return
+
+    # The transfer blocks below are written as branchless saturation
+    # arithmetic: each guard collapses into an available-volume select,
+    # the clamped delta is applied unconditionally (adding 0.0 is a
+    # no-op), and the mix formulas are exact identities when the delta
+    # is zero, so LLVM emits min/max selects instead of jump chains.
+
+    # Acid transfer T-01 → M-01 via P-01 (simplified: 0.5 m3/h when running)
+    avail = state[T01_LEVEL] if state[M01_LEVEL] < m01_vol else 0.0
+    dV = max(0.0, min(dv_acid, avail))
+    state[T01_LEVEL] -= dV
+    state[M01_LEVEL] += dV
+    # Mix concentration in M-01 (simple mass balance); with dV == 0 this
+    # reduces to conc * level / level == conc
+    denom = state[M01_LEVEL] if state[M01_LEVEL] > 0.0 else 1.0
+    state[M01_CONC] = (
+        state[M01_CONC] * (state[M01_LEVEL] - dV) + state[T01_CONC] * dV
+    ) / denom
+
+    # Water feed V-01 (4 m3/h)
+    dVw = max(0.0, min(dv_water, m01_vol - state[M01_LEVEL]))
+    state[M01_LEVEL] += dVw
+    # dilution, concentration ↓ (exact no-op when dVw == 0)
+    denom = state[M01_LEVEL] if state[M01_LEVEL] > 0.0 else 1.0
+    state[M01_CONC] *= (state[M01_LEVEL] - dVw) / denom
+
+    # When M-01 level >2 m3 and conc <60 %, pump P-02 to reactor (1 m3/h)
+    avail2 = (
+        state[M01_LEVEL]
+        if state[M01_LEVEL] > 2.0 and state[M01_CONC] < 60.0
+        else 0.0
+    )
+    # Pairwise comparisons instead of the 3-argument min(), which goes
+    # through the iterator protocol; these lower to two compare/selects.
+    room2 = r01_vol - state[R01_LEVEL]
+    dV2 = dv_p2 if dv_p2 < avail2 else avail2
+    dV2 = dV2 if dV2 < room2 else room2
+    dV2 = dV2 if dV2 > 0.0 else 0.0
+    state[M01_LEVEL] -= dV2
+    state[R01_LEVEL] += dV2
+
+    # Reaction + pressure diagnostics share one set of reactor locals:
+    # the settled level, its free volume and the acid concentration are
+    # read once here instead of per sub-expression.
+    r01_level = state[R01_LEVEL]
+    r01_conc = state[R01_CONC]
+
+    # Instantaneous reaction in reactor when acid present
+    if r01_conc < 1e-3 and state[M01_CONC] < 60.0:
+        # first arrival of acid
+        r01_conc = state[M01_CONC]
+        state[R01_CONC] = r01_conc
+    if r01_conc > 0 and state[CA_MASS] > 0:
+        # stoichiometric reaction: CaCO3 + H2SO4 → CaSO4 + CO2 + H2O
+        acid_moles = r01_level * 1000.0 * r01_conc / 100.0 * _INV_M_H2SO4
+        # NB: the CaCO3 terms keep the divide form so the slurry mass
+        # cancels to exactly 0.0 when fully consumed.
+        ca_moles = state[CA_MASS] / M_CACO3 * 1000.0
+        reacted = min(acid_moles, ca_moles)
+        state[CA_MASS] -= reacted * M_CACO3 / 1000.0
+        # CO2 generation increases pressure (ideal gas, adiabatic in 10 m3)
+        if r01_level < r01_vol:
+            free_vol_m3 = r01_vol - r01_level
+            n_CO2 = reacted  # kmol
+            T = state[R01_TEMP]
+            p_Pa = n_CO2 * 1000.0 * R_GAS * T / free_vol_m3
+            state[PRESSURE] = p_Pa / 1e5
+
+    # PSV opens at 3 barg (i.e. 4 bar absolute)
+    p_g = max(0.0, state[PRESSURE] - 1.0)
+    if p_g > 3.0:
+        # simple proportional relief back towards 3 barg
+        relief = (p_g - 3.0) * 0.1
+        # convert relief (gauge) to absolute delta
+        state[PRESSURE] -= relief
+
+
+@njit("void(f8[:], i8, f8, f8, f8, f8)", cache=True)
+def _step_n_kernel(state, n, dt, dv_acid, dv_water, dv_p2):
+    """Run ``n`` consecutive steps without returning to the interpreter.
+
+    Amortizes the Python→native call boundary over the whole batch, so
+    the background loop can wake once and advance many ticks at high
+    speed factors.
+    """
+    for _ in range(n):
+        _step_kernel(state, dt, dv_acid, dv_water, dv_p2)
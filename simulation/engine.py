@@ -1,30 +1,51 @@
 """Basic discrete-time simulation of the CaCO3 + H2SO4 process.
 This is intentionally simplified and suitable for educational/demo use.
+
+The per-step arithmetic is compiled with Numba (see ``_kernels.py``); the
+engine keeps the authoritative state in a flat float64 vector that the
+kernel mutates in place. Vessel data is a structure-of-arrays view into
+that vector — one row per vessel — instead of per-vessel Python objects.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
+import threading
 from typing import Dict
 
-R_GAS = 8.314  # J/mol·K
-M_CACO3 = 100.09  # kg/kmol
-M_H2SO4 = 98.079  # kg/kmol
+import numpy as np
 
+from ._kernels import (
+    CA_MASS,
+    PRESSURE,
+    STATE_SIZE,
+    TIME,
+    _P2_RATE,
+    _TRANSFER_RATE,
+    _WATER_RATE,
+    _step_n_kernel,
+)
 
-@dataclass
-class Vessel:
-    name: str
-    volume_m3: float
-    level_m3: float
-    temperature_K: float
-    concentration_wt: float  # H2SO4 wt-% for acid vessels
+# Column indices into the per-vessel rows of the state array
+VOL, LEVEL, TEMP, CONC = 0, 1, 2, 3
 
 
 class SimulationEngine:
     # Run loop target period – one physics step per real-time second
     timestep = 1.0  # [s]
 
+    vessel_names = ("T-01", "M-01", "R-01")
+
     def __init__(self):
+        # Set by the HTTP handlers to interrupt the background loop's
+        # pacing wait (pause / speed change) without waiting out a sleep.
+        self._wake = threading.Event()
+        # Serialized snapshot cache: /api/state reuses the same bytes for
+        # every poll between steps; anything that changes snapshot content
+        # calls _snapshot_changed() to drop the cache and wake streamers.
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_bytes: bytes | None = None
+        # Notified whenever snapshot content changes; /api/stream waits on
+        # this to push exactly one SSE event per state change.
+        self._snapshot_cond = threading.Condition()
         self.reset()
 
     # -----------------------------------------------------
@@ -33,74 +54,67 @@ class SimulationEngine:
     running: bool = False
 
     def reset(self):
-        # Vessels
-        self.t01 = Vessel("T-01", 5.0, 5.0, 298.0, 98.0)
-        self.m01 = Vessel("M-01", 10.0, 0.0, 298.0, 0.0)
-        self.r01 = Vessel("R-01", 10.0, 5.0, 298.0, 0.0)
+        self._state = np.empty(STATE_SIZE, dtype=np.float64)
+        # Vessels: one row each of (volume, level, temperature,
+        # concentration) for T-01, M-01, R-01, viewing the kernel's
+        # flat state vector so no marshalling is needed per step.
+        self.vessels = self._state[: 3 * 4].reshape(3, 4)
+        self.vessels[:] = (
+            (5.0, 5.0, 298.0, 98.0),
+            (10.0, 0.0, 298.0, 0.0),
+            (10.0, 5.0, 298.0, 0.0),
+        )
         # Reaction data
         self.ca_slurry_mass_kg = 5.0 * 1000.0 * 0.10  # 5 m3 × 1000 kg/m3 × 10 %
-        # absolute pressure in bar (1 bar = atmospheric, so 0 barg)
+        # absolute pressure in bar (1 bar = atmospheric, so 0 barg);
+        # the gauge value is maintained alongside it rather than derived
+        # through a property on every read
         self.pressure_bar_abs = 1.0
+        self.pressure_bar_g = 0.0
         self.time_s = 0.0
+        self._state[CA_MASS] = self.ca_slurry_mass_kg
+        self._state[PRESSURE] = self.pressure_bar_abs
+        self._state[TIME] = self.time_s
         # simulation speed multiplier (1.0 = real-time, 10 = 10× faster, etc.)
         self.speed_factor = 1.0
+        self.recompile()
+        self._snapshot_changed()
+
+    def recompile(self, dt: float | None = None):
+        """Precompute the rate·dt transfer increments for a fixed-dt run.
+
+        dt is constant for the life of a run, so the per-pump volume
+        increments are loop invariants: computing them here instead of
+        inside every step saves three multiplies per tick.
+        """
+        dt = self.timestep if dt is None else dt
+        self._compiled_dt = dt
+        self._dV_acid = _TRANSFER_RATE * dt
+        self._dV_water = _WATER_RATE * dt
+        self._dV_p2 = _P2_RATE * dt
 
     def step(self, dt: float):
         """Advance simulation by dt seconds."""
+        self.step_n(1, dt)
+
+    def step_n(self, n: int, dt: float):
+        """Advance simulation by n consecutive steps of dt seconds.
+
+        The whole batch runs inside one compiled-kernel call, so the
+        background loop pays the Python→native boundary (and snapshot
+        invalidation) once per batch instead of once per tick.
+        """
         # dt is already scaled by the caller (background thread) according
         # to `speed_factor`, so we use it directly.
-        self.time_s += dt
-        # Acid transfer T-01 → M-01 via P-01 (simplified: 0.5 m3/h when running)
-        transfer_rate = 0.5 / 3600.0  # m3/s
-        if self.t01.level_m3 > 0 and self.m01.level_m3 < self.m01.volume_m3:
-            dV = min(transfer_rate * dt, self.t01.level_m3)
-            self.t01.level_m3 -= dV
-            self.m01.level_m3 += dV
-            # Mix concentration in M-01 (simple mass balance)
-            self.m01.concentration_wt = (
-                self.m01.concentration_wt * (self.m01.level_m3 - dV)
-                + self.t01.concentration_wt * dV
-            ) / self.m01.level_m3
-        # Water feed V-01 (4 m3/h)
-        water_rate = 4.0 / 3600.0  # m3/s
-        if self.m01.level_m3 < self.m01.volume_m3:
-            dVw = min(water_rate * dt, self.m01.volume_m3 - self.m01.level_m3)
-            self.m01.level_m3 += dVw
-            # dilution, concentration ↓
-            if self.m01.level_m3 > 0:
-                self.m01.concentration_wt *= (self.m01.level_m3 - dVw) / self.m01.level_m3
-        # When M-01 level >2 m3 and conc <60 %, pump P-02 to reactor (1 m3/h)
-        p2_rate = 1.0 / 3600.0
-        if self.m01.level_m3 > 2.0 and self.m01.concentration_wt < 60.0 and self.r01.level_m3 < self.r01.volume_m3:
-            dV2 = min(p2_rate * dt, self.m01.level_m3, self.r01.volume_m3 - self.r01.level_m3)
-            self.m01.level_m3 -= dV2
-            self.r01.level_m3 += dV2
-        # Instantaneous reaction in reactor when acid present
-        if self.r01.concentration_wt < 1e-3 and self.m01.concentration_wt < 60.0:
-            # first arrival of acid
-            self.r01.concentration_wt = self.m01.concentration_wt
-        if self.r01.concentration_wt > 0 and self.ca_slurry_mass_kg > 0:
-            # stoichiometric reaction: CaCO3 + H2SO4 → CaSO4 + CO2 + H2O
-            acid_moles = (
-                self.r01.level_m3 * 1000.0 * self.r01.concentration_wt / 100.0 / M_H2SO4 * 1000.0
-            )
-            ca_moles = self.ca_slurry_mass_kg / M_CACO3 * 1000.0
-            reacted = min(acid_moles, ca_moles)
-            self.ca_slurry_mass_kg -= reacted * M_CACO3 / 1000.0
-            # CO2 generation increases pressure (ideal gas, adiabatic in 10 m3)
-            if self.r01.level_m3 < self.r01.volume_m3:
-                free_vol_m3 = self.r01.volume_m3 - self.r01.level_m3
-                n_CO2 = reacted  # kmol
-                T = self.r01.temperature_K
-                p_Pa = n_CO2 * 1000.0 * R_GAS * T / free_vol_m3
-                self.pressure_bar_abs = p_Pa / 1e5
-
-        # PSV opens at 3 barg (i.e. 4 bar absolute)
-        if self.pressure_bar_g > 3.0:
-            # simple proportional relief back towards 3 barg
-            relief = (self.pressure_bar_g - 3.0) * 0.1
-            # convert relief (gauge) to absolute delta
-            self.pressure_bar_abs -= relief
+        if dt != self._compiled_dt:
+            self.recompile(dt)
+        _step_n_kernel(self._state, n, dt, self._dV_acid, self._dV_water, self._dV_p2)
+        # Mirror the scalars back as plain floats for snapshot()/JSON.
+        self.time_s = float(self._state[TIME])
+        self.ca_slurry_mass_kg = float(self._state[CA_MASS])
+        self.pressure_bar_abs = float(self._state[PRESSURE])
+        self.pressure_bar_g = max(0.0, self.pressure_bar_abs - 1.0)
+        self._snapshot_changed()
 
     # -----------------------------------------------------
     # Convenience helpers
@@ -109,23 +123,30 @@ class SimulationEngine:
         """Set simulation speed multiplier (0 .. 100)."""
         # clamp to sane range
         self.speed_factor = max(0.0, min(factor, 100.0))
+        self._snapshot_changed()  # speed_factor is part of the snapshot
+
+    def _snapshot_changed(self):
+        """Drop the cached snapshot bytes and wake any SSE streamers."""
+        self._snapshot_bytes = None
+        with self._snapshot_cond:
+            self._snapshot_cond.notify_all()
 
     def snapshot(self) -> Dict:
         return {
             "time": self.time_s,
-            "tanks": [asdict(v) for v in (self.t01, self.m01, self.r01)],
+            "tanks": [
+                {
+                    "name": name,
+                    "volume_m3": float(row[VOL]),
+                    "level_m3": float(row[LEVEL]),
+                    "temperature_K": float(row[TEMP]),
+                    "concentration_wt": float(row[CONC]),
+                }
+                for name, row in zip(self.vessel_names, self.vessels)
+            ],
             "ca_mass": self.ca_slurry_mass_kg,
             "pressure_bar_abs": self.pressure_bar_abs,
             "pressure_bar_g": self.pressure_bar_g,
             "running": self.running,
             "speed_factor": self.speed_factor,
         }
-
-    # -----------------------------------------------------
-    # Derived properties
-    # -----------------------------------------------------
-
-    @property
-    def pressure_bar_g(self) -> float:
-        """Gauge pressure (relative to 1 bar atmosphere)."""
-        return max(0.0, self.pressure_bar_abs - 1.0)